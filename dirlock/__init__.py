@@ -1,7 +1,17 @@
 import os
+import sys
+import select
 import signal
+import struct
 import time
 import atexit
+import asyncio
+import ctypes
+import ctypes.util
+import random
+import socket
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
 """
 This module provides a directory-based locking mechanism.
@@ -94,13 +104,228 @@ except Exception:
     pass
 
 
+# inotify is only available on linux, everywhere else
+# waiting falls back to polling
+_libc = None
+if sys.platform.startswith("linux"):
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                            use_errno=True)
+        _libc.inotify_init1.argtypes = [ctypes.c_int]
+        _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p,
+                                            ctypes.c_uint32]
+    except (OSError, AttributeError):
+        _libc = None
+
+_IN_MOVED_FROM = 0x00000040
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_ONLYDIR = 0x01000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class _InotifyWatch:
+    """
+    Watch the parent directory of a lock for the removal of the lock directory.
+    """
+
+    def __init__(self, lock_dir: str):
+        parent, self.name = os.path.split(os.path.abspath(lock_dir))
+        self.name = os.fsencode(self.name)
+        self.fd = _libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        mask = (_IN_DELETE | _IN_MOVED_FROM | _IN_DELETE_SELF
+                | _IN_MOVE_SELF | _IN_ONLYDIR)
+        if _libc.inotify_add_watch(self.fd, os.fsencode(parent), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, os.strerror(err))
+
+    def fileno(self):
+        return self.fd
+
+    def read_events(self) -> bool:
+        """
+        Drain pending events.
+
+        Returns:
+            bool: True if the lock directory (or its parent) went away.
+        """
+        removed = False
+        while True:
+            try:
+                buf = os.read(self.fd, 4096)
+            except BlockingIOError:
+                return removed
+            offset = 0
+            while offset < len(buf):
+                _, mask, _, length = _INOTIFY_EVENT.unpack_from(buf, offset)
+                offset += _INOTIFY_EVENT.size
+                name = buf[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF) or name == self.name:
+                    removed = True
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Block until the lock directory is removed or the timeout expires.
+
+        Returns:
+            bool: True if a removal was observed.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return False
+            if self.read_events():
+                return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _open_watch(lock_dir: str):
+    """
+    Create an inotify watch for lock_dir or return None if not possible.
+    """
+    if _libc is None:
+        return None
+    try:
+        return _InotifyWatch(lock_dir)
+    except OSError:
+        # e.g. out of watches or parent directory missing
+        return None
+
+
+async def _wait_watch_async(watch: _InotifyWatch, timeout: float) -> bool:
+    """
+    Wait for a removal reported by watch using the running event loop.
+
+    Returns:
+        bool: True if a removal was observed.
+    """
+    loop = asyncio.get_running_loop()
+    removed = loop.create_future()
+
+    def on_readable():
+        if watch.read_events() and not removed.done():
+            removed.set_result(True)
+
+    try:
+        loop.add_reader(watch.fileno(), on_readable)
+    except NotImplementedError:
+        # event loop without reader support
+        await asyncio.sleep(timeout)
+        return False
+    try:
+        return await asyncio.wait_for(removed, timeout)
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        loop.remove_reader(watch.fileno())
+
+
+class RetryPolicy:
+    """
+    Base class for retry policies.
+
+    A retry policy decides how long a waiter sleeps between two attempts
+    to create the lock directory. Policies are stateless, every call to
+    acquire() starts a fresh sequence via delays().
+    """
+
+    def delays(self):
+        """
+        Return an iterator over the successive wait times (in seconds).
+        """
+        raise NotImplementedError
+
+
+class ConstantRetry(RetryPolicy):
+    """
+    Wait the same interval between all attempts.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+    def delays(self):
+        while True:
+            yield self.interval
+
+    def __repr__(self):
+        return f"ConstantRetry({self.interval!r})"
+
+
+class ExponentialBackoff(RetryPolicy):
+    """
+    Exponentially growing wait times, capped at a maximum.
+
+    With many waiters on a shared filesystem the jitter spreads the
+    retries so that a release does not trigger a storm of mkdir calls.
+
+    jitter can be one of:
+        None: initial * multiplier ** n, capped at maximum
+        "full": uniformly random between 0 and the capped exponential value
+        "decorrelated": uniformly random between initial and three
+            times the previous wait, capped at maximum
+    """
+
+    JITTER_MODES = (None, "full", "decorrelated")
+
+    def __init__(self,
+                 initial: float = 0.01,
+                 maximum: float = 5.0,
+                 multiplier: float = 2.0,
+                 jitter: str = "full"):
+        if jitter not in ExponentialBackoff.JITTER_MODES:
+            raise ValueError(f"unknown jitter mode: {jitter!r}")
+        if initial <= 0 or maximum < initial:
+            raise ValueError("need 0 < initial <= maximum")
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def delays(self):
+        if self.jitter == "decorrelated":
+            delay = self.initial
+            while True:
+                delay = min(self.maximum,
+                            random.uniform(self.initial, delay * 3))
+                yield delay
+        base = self.initial
+        while True:
+            if self.jitter == "full":
+                yield random.uniform(0, base)
+            else:
+                yield base
+            base = min(self.maximum, base * self.multiplier)
+
+    def __repr__(self):
+        return (f"ExponentialBackoff(initial={self.initial!r}, "
+                f"maximum={self.maximum!r}, multiplier={self.multiplier!r}, "
+                f"jitter={self.jitter!r})")
+
+
 class DirLock:
     default_retry_interval: float = 0.1
+    default_retry_policy: RetryPolicy = None
+    default_use_inotify: bool = False
 
     def __init__(self,
                  lock_dir: str,
                  retry_interval: float = None,
-                 timeout_interval: float = -1):
+                 timeout_interval: float = -1,
+                 use_inotify: bool = None,
+                 retry_policy: RetryPolicy = None):
         """
         Initialize the DirLock.
 
@@ -108,6 +333,11 @@ class DirLock:
             lock_dir (str): Path to the lock directory.
             retry_interval (float): Time to wait before retrying (in seconds).
             timeout_interval (float): Timeout
+            use_inotify (bool): Wake up waiters as soon as the lock directory
+                is removed instead of sleeping for the full retry interval.
+                Only available on linux, otherwise polling is used.
+            retry_policy (RetryPolicy): Policy deciding the wait between two
+                attempts. Takes precedence over retry_interval.
         """
         self.lock_dir = str(lock_dir)
         self.timeout_interval = timeout_interval
@@ -116,30 +346,106 @@ class DirLock:
             self.retry_interval = DirLock.default_retry_interval
         else:
             self.retry_interval = retry_interval
+        if retry_policy is not None:
+            self.retry_policy = retry_policy
+        elif retry_interval is None and DirLock.default_retry_policy is not None:
+            self.retry_policy = DirLock.default_retry_policy
+        else:
+            self.retry_policy = ConstantRetry(self.retry_interval)
+        if use_inotify is None:
+            self.use_inotify = DirLock.default_use_inotify
+        else:
+            self.use_inotify = use_inotify
         self.acquired = False
 
-    def acquire(self):
+    def _try_acquire(self) -> bool:
         """
-        Acquire the lock by following the directory-based lock mechanism.
+        Make a single attempt to create the lock directory.
         """
         global _allActiveLocks
-        start_time = datetime.now()
+        try:
+            os.mkdir(self.lock_dir)
+        except FileExistsError:
+            return False
+        self.acquired = True
+        _allActiveLocks.add(self)
+        return True
 
-        while True:
-            try:
-                os.mkdir(self.lock_dir)
-                self.acquired = True
-                _allActiveLocks.add(self)
-                break
-            except FileExistsError:
-                pass
+    def _acquire_steps(self):
+        """
+        Generator driving the acquisition.
 
+        Yields the time to wait before the next attempt and finishes once
+        the lock is held. The waiting itself is left to the caller, so the
+        same logic serves acquire() and acquire_async().
+
+        Raises:
+            LockTimeoutException: if the lock could not be acquired in time.
+        """
+        start_time = datetime.now()
+        delays = self.retry_policy.delays()
+
+        while not self._try_acquire():
             if self.timeout_interval >= 0.0:
                 if (datetime.now() - start_time).total_seconds() > self.timeout_interval:
                     raise LockTimeoutException()
 
             # If the lock directory exists, retry
-            time.sleep(self.retry_interval)
+            yield next(delays)
+
+    def acquire(self):
+        """
+        Acquire the lock by following the directory-based lock mechanism.
+        """
+        watch = None
+        watch_tried = False
+
+        try:
+            for delay in self._acquire_steps():
+                if self.use_inotify and not watch_tried:
+                    watch_tried = True
+                    watch = _open_watch(self.lock_dir)
+                    if watch is not None:
+                        # the lock might have been released before the
+                        # watch was in place, so try again right away
+                        continue
+
+                if watch is not None:
+                    # the retry delay still bounds the wait so removals
+                    # inotify does not report (e.g. on NFS) are noticed
+                    watch.wait(delay)
+                else:
+                    time.sleep(delay)
+        finally:
+            if watch is not None:
+                watch.close()
+
+    async def acquire_async(self):
+        """
+        Acquire the lock without blocking the running event loop.
+
+        Waiting is done with asyncio.sleep or, with use_inotify, by
+        registering the inotify descriptor with the event loop.
+        Cancelling the calling task while waiting leaves the lock untouched.
+        """
+        watch = None
+        watch_tried = False
+
+        try:
+            for delay in self._acquire_steps():
+                if self.use_inotify and not watch_tried:
+                    watch_tried = True
+                    watch = _open_watch(self.lock_dir)
+                    if watch is not None:
+                        continue
+
+                if watch is not None:
+                    await _wait_watch_async(watch, delay)
+                else:
+                    await asyncio.sleep(delay)
+        finally:
+            if watch is not None:
+                watch.close()
 
     def release(self):
         """
@@ -166,6 +472,169 @@ class DirLock:
         """
         self.release()
 
+    async def __aenter__(self):
+        """
+        Async context management entry point.
+        """
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        Async context management exit point.
+        """
+        self.release()
+
+
+class DirRWLock:
+    """
+    Shared/exclusive lock built on lock directories.
+
+    lock_dir is a directory holding the lock state and is left in place:
+
+        lock_dir/writer        exclusive writer lock (a DirLock)
+        lock_dir/readers/<id>  one entry per held read lock
+
+    A writer first takes the writer lock, which keeps new readers out,
+    and then waits for the active readers to drain. A reader creates
+    its entry only while no writer is present and backs off again if a
+    writer showed up in the meantime, so writers are preferred and
+    cannot be starved by a steady stream of readers.
+    """
+
+    def __init__(self,
+                 lock_dir: str,
+                 retry_interval: float = None,
+                 timeout_interval: float = -1,
+                 retry_policy: RetryPolicy = None):
+        """
+        Initialize the DirRWLock.
+
+        Args:
+            lock_dir (str): Path to the directory holding the lock state.
+            retry_interval (float): Time to wait before retrying (in seconds).
+            timeout_interval (float): Timeout
+            retry_policy (RetryPolicy): Policy deciding the wait between two
+                attempts. Takes precedence over retry_interval.
+        """
+        self.lock_dir = str(lock_dir)
+        self.timeout_interval = timeout_interval
+        self.writer_dir = os.path.join(self.lock_dir, "writer")
+        self.readers_dir = os.path.join(self.lock_dir, "readers")
+        self._writer = DirLock(self.writer_dir,
+                               retry_interval=retry_interval,
+                               timeout_interval=timeout_interval,
+                               retry_policy=retry_policy)
+        self.retry_policy = self._writer.retry_policy
+        self._reader_entries = []
+
+    @property
+    def read_acquired(self) -> bool:
+        return len(self._reader_entries) > 0
+
+    @property
+    def write_acquired(self) -> bool:
+        return self._writer.acquired
+
+    def _timed_out(self, start_time) -> bool:
+        if self.timeout_interval < 0.0:
+            return False
+        return (datetime.now() - start_time).total_seconds() > self.timeout_interval
+
+    def acquire_read(self):
+        """
+        Acquire a shared lock. Multiple readers can hold it at the same time.
+        """
+        global _allActiveLocks
+        os.makedirs(self.readers_dir, exist_ok=True)
+        start_time = datetime.now()
+        delays = self.retry_policy.delays()
+        entry_name = f"{socket.gethostname()}.{os.getpid()}.{uuid.uuid4().hex}"
+        entry = os.path.join(self.readers_dir, entry_name)
+
+        while True:
+            if not os.path.exists(self.writer_dir):
+                os.mkdir(entry)
+                # a writer checks for readers after taking the writer lock,
+                # so either it sees our entry or we see its lock here
+                if not os.path.exists(self.writer_dir):
+                    self._reader_entries.append(entry)
+                    _allActiveLocks.add(self)
+                    return
+                os.rmdir(entry)
+
+            if self._timed_out(start_time):
+                raise LockTimeoutException()
+
+            time.sleep(next(delays))
+
+    def release_read(self):
+        """
+        Release one shared lock held by this instance.
+        """
+        if self._reader_entries:
+            entry = self._reader_entries.pop()
+            try:
+                os.rmdir(entry)
+            except FileNotFoundError:
+                pass
+            if not self._reader_entries:
+                _allActiveLocks.discard(self)
+
+    def acquire_write(self):
+        """
+        Acquire the exclusive lock.
+        """
+        os.makedirs(self.readers_dir, exist_ok=True)
+        start_time = datetime.now()
+        self._writer.acquire()
+
+        delays = self.retry_policy.delays()
+        try:
+            while os.listdir(self.readers_dir):
+                if self._timed_out(start_time):
+                    raise LockTimeoutException()
+                time.sleep(next(delays))
+        except BaseException:
+            self._writer.release()
+            raise
+
+    def release_write(self):
+        """
+        Release the exclusive lock if it is held by this instance.
+        """
+        self._writer.release()
+
+    def release(self):
+        """
+        Release all locks held by this instance.
+        """
+        while self._reader_entries:
+            self.release_read()
+        self.release_write()
+
+    @contextmanager
+    def read(self):
+        """
+        Context manager holding a shared lock.
+        """
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """
+        Context manager holding the exclusive lock.
+        """
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
+
 
 class LockTimeoutException(Exception):
     def __init__(self, message="acquiring lock timed out"):
@@ -1,10 +1,15 @@
+import asyncio
 import os
 import signal
 import subprocess
 import sys
+import threading
 import time
 from unittest.mock import patch, MagicMock
+
+import pytest
 from dirlock import DirLock, LockTimeoutException, _allActiveLocks, _clean_locks
+from dirlock import ConstantRetry, ExponentialBackoff, DirRWLock
 
 
 def test_two_locks(tmpdir):
@@ -167,6 +172,7 @@ def test_atexit_integration(tmpdir):
     """Test atexit integration using subprocess."""
     # Create a test script that uses DirLock and exits normally
     test_script = f'''
+import asyncio
 import os
 import sys
 sys.path.insert(0, "{os.path.dirname(os.path.dirname(__file__))}")
@@ -205,10 +211,14 @@ def test_signal_integration_sigterm(tmpdir):
     """Test SIGTERM signal handling using subprocess."""
     # Create a test script that uses DirLock and receives SIGTERM
     test_script = f'''
+import asyncio
 import os
 import sys
 import signal
+import threading
 import time
+
+import pytest
 sys.path.insert(0, "{os.path.dirname(os.path.dirname(__file__))}")
 from dirlock import DirLock
 
@@ -284,6 +294,7 @@ def test_atexit_on_unhandled_exception(tmpdir):
     """Test that atexit cleanup works even when script crashes with unhandled exception."""
     # Create a test script that uses DirLock and crashes with an exception
     test_script = f'''
+import asyncio
 import os
 import sys
 sys.path.insert(0, "{os.path.dirname(os.path.dirname(__file__))}")
@@ -332,3 +343,244 @@ raise ValueError("Intentional crash to test cleanup")
     # Most importantly: check that the lock was cleaned up despite the crash
     assert not os.path.exists(os.path.join(tmpdir, '.lock')), \
         "Lock should be cleaned up even after unhandled exception"
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"),
+                    reason="inotify is only available on linux")
+def test_inotify_wakeup(tmpdir):
+    """Test that an inotify waiter wakes up on release instead of polling."""
+    lockdir = os.path.join(tmpdir, '.lock')
+    holder = DirLock(lockdir)
+    holder.acquire()
+
+    # with a long retry interval only the inotify event can wake the waiter
+    waiter = DirLock(lockdir, retry_interval=30, use_inotify=True)
+    acquired_at = []
+
+    def wait():
+        waiter.acquire()
+        acquired_at.append(time.monotonic())
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    time.sleep(0.2)
+    assert not waiter.acquired
+
+    released_at = time.monotonic()
+    holder.release()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert waiter.acquired
+    assert acquired_at[0] - released_at < 1.0
+    waiter.release()
+
+
+def test_inotify_fallback_to_polling(tmpdir):
+    """Test that use_inotify still works when inotify is not available."""
+    lockdir = os.path.join(tmpdir, '.lock')
+    holder = DirLock(lockdir)
+    holder.acquire()
+
+    waiter = DirLock(lockdir, retry_interval=0.05, timeout_interval=0.2,
+                     use_inotify=True)
+    with patch('dirlock._libc', None):
+        try:
+            waiter.acquire()
+            assert False
+        except LockTimeoutException:
+            assert not waiter.acquired
+
+        holder.release()
+        waiter.acquire()
+        assert waiter.acquired
+    waiter.release()
+
+
+def test_retry_policies():
+    """Test the wait sequences produced by the retry policies."""
+    constant = ConstantRetry(0.5).delays()
+    assert [next(constant) for _ in range(3)] == [0.5, 0.5, 0.5]
+
+    plain = ExponentialBackoff(initial=0.1, maximum=0.5, jitter=None).delays()
+    assert [next(plain) for _ in range(5)] == [0.1, 0.2, 0.4, 0.5, 0.5]
+
+    full = ExponentialBackoff(initial=0.1, maximum=0.5, jitter="full").delays()
+    for cap in [0.1, 0.2, 0.4, 0.5, 0.5]:
+        assert 0 <= next(full) <= cap
+
+    decorrelated = ExponentialBackoff(initial=0.1, maximum=0.5,
+                                      jitter="decorrelated").delays()
+    for _ in range(20):
+        assert 0.1 <= next(decorrelated) <= 0.5
+
+    with pytest.raises(ValueError):
+        ExponentialBackoff(jitter="bogus")
+
+
+def test_retry_policy_selection(tmpdir):
+    """Test how DirLock picks its retry policy."""
+    lockdir = os.path.join(tmpdir, '.lock')
+    policy = ExponentialBackoff()
+
+    assert DirLock(lockdir).retry_policy.interval == DirLock.default_retry_interval
+    assert DirLock(lockdir, retry_interval=2).retry_policy.interval == 2
+    assert DirLock(lockdir, retry_policy=policy).retry_policy is policy
+
+    with patch.object(DirLock, 'default_retry_policy', policy):
+        assert DirLock(lockdir).retry_policy is policy
+        # an explicit interval still wins over the class default
+        assert DirLock(lockdir, retry_interval=2).retry_policy.interval == 2
+
+
+def test_backoff_timeout(tmpdir):
+    """Test that acquiring with a backoff policy still times out."""
+    lockdir = os.path.join(tmpdir, '.lock')
+    lock1 = DirLock(lockdir)
+    lock2 = DirLock(lockdir, timeout_interval=0.3,
+                    retry_policy=ExponentialBackoff(initial=0.01, maximum=0.05))
+
+    lock1.acquire()
+    with pytest.raises(LockTimeoutException):
+        lock2.acquire()
+    assert not lock2.acquired
+
+    lock1.release()
+    lock2.acquire()
+    assert lock2.acquired
+    lock2.release()
+
+
+def test_async_context_manager(tmpdir):
+    """Test acquiring the lock from asyncio with async with."""
+    lockdir = os.path.join(tmpdir, '.lock')
+
+    async def main():
+        async with DirLock(lockdir) as lock:
+            assert lock.acquired
+            assert os.path.exists(lockdir)
+            assert lock in _allActiveLocks
+        assert not lock.acquired
+        assert not os.path.exists(lockdir)
+
+    asyncio.run(main())
+    assert len(_allActiveLocks) == 0
+
+
+@pytest.mark.parametrize("use_inotify", [False, True])
+def test_async_waiters_share_loop(tmpdir, use_inotify):
+    """Test that waiting tasks do not block the event loop."""
+    lockdir = os.path.join(tmpdir, '.lock')
+    order = []
+
+    async def worker(name):
+        lock = DirLock(lockdir, retry_interval=0.01, use_inotify=use_inotify)
+        async with lock:
+            order.append(name)
+            await asyncio.sleep(0.05)
+
+    async def main():
+        await asyncio.gather(*(worker(i) for i in range(5)))
+
+    asyncio.run(main())
+    assert sorted(order) == list(range(5))
+    assert not os.path.exists(lockdir)
+
+
+def test_async_cancel_and_timeout(tmpdir):
+    """Test cancellation and timeouts of acquire_async."""
+    lockdir = os.path.join(tmpdir, '.lock')
+    holder = DirLock(lockdir)
+    holder.acquire()
+
+    async def main():
+        waiter = DirLock(lockdir, retry_interval=0.01)
+        task = asyncio.ensure_future(waiter.acquire_async())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert not waiter.acquired
+
+        waiter = DirLock(lockdir, retry_interval=0.01, timeout_interval=0.1)
+        with pytest.raises(LockTimeoutException):
+            await waiter.acquire_async()
+        assert not waiter.acquired
+
+    asyncio.run(main())
+    assert os.path.exists(lockdir)
+    holder.release()
+    assert len(_allActiveLocks) == 0
+
+
+def test_rwlock_shared_readers(tmpdir):
+    """Test that readers share the lock and writers are excluded."""
+    lockdir = os.path.join(tmpdir, '.rwlock')
+    reader1 = DirRWLock(lockdir)
+    reader2 = DirRWLock(lockdir)
+    writer = DirRWLock(lockdir, retry_interval=0.01, timeout_interval=0.1)
+
+    with reader1.read(), reader2.read():
+        assert reader1.read_acquired
+        assert reader2.read_acquired
+        assert len(os.listdir(os.path.join(lockdir, 'readers'))) == 2
+        assert len(_allActiveLocks) == 2
+
+        with pytest.raises(LockTimeoutException):
+            writer.acquire_write()
+        assert not writer.write_acquired
+        assert not os.path.exists(os.path.join(lockdir, 'writer'))
+
+    assert not reader1.read_acquired
+    assert len(_allActiveLocks) == 0
+
+    with writer.write():
+        assert writer.write_acquired
+        with pytest.raises(LockTimeoutException):
+            DirRWLock(lockdir, retry_interval=0.01,
+                      timeout_interval=0.1).acquire_read()
+    assert os.listdir(os.path.join(lockdir, 'readers')) == []
+
+
+def test_rwlock_writer_preference(tmpdir):
+    """Test that a waiting writer keeps new readers out."""
+    lockdir = os.path.join(tmpdir, '.rwlock')
+    reader = DirRWLock(lockdir)
+    writer = DirRWLock(lockdir, retry_interval=0.01)
+    late_reader = DirRWLock(lockdir, retry_interval=0.01, timeout_interval=0.2)
+
+    reader.acquire_read()
+    thread = threading.Thread(target=writer.acquire_write)
+    thread.start()
+    time.sleep(0.1)
+
+    # the writer is waiting for the reader to drain
+    assert not writer.write_acquired
+    with pytest.raises(LockTimeoutException):
+        late_reader.acquire_read()
+
+    reader.release_read()
+    thread.join(timeout=5)
+    assert writer.write_acquired
+    writer.release_write()
+
+
+def test_rwlock_clean_locks(tmpdir):
+    """Test that _clean_locks releases read and write locks."""
+    lockdir1 = os.path.join(tmpdir, '.rwlock1')
+    lockdir2 = os.path.join(tmpdir, '.rwlock2')
+    reader = DirRWLock(lockdir1)
+    writer = DirRWLock(lockdir2)
+
+    reader.acquire_read()
+    reader.acquire_read()
+    writer.acquire_write()
+    assert len(_allActiveLocks) == 2
+
+    _clean_locks()
+
+    assert not reader.read_acquired
+    assert not writer.write_acquired
+    assert os.listdir(os.path.join(lockdir1, 'readers')) == []
+    assert not os.path.exists(os.path.join(lockdir2, 'writer'))
+    assert len(_allActiveLocks) == 0